@@ -0,0 +1,73 @@
+"""Checks for the regex-based tide page parser."""
+
+from tide import HIGH, LOW, parse_tide_data
+
+
+def _page(day_html: str) -> bytes:
+    """Wrap today's section in a page with a following day that must be ignored."""
+    return f"""<!DOCTYPE html><html><body><ul class="days">
+<li class="day first"><ul>
+{day_html}
+</ul></li>
+<li class="day"><ul>
+<li class="point point-high"><h3>1:11 am</h3><span>1.20m</span></li>
+</ul></li>
+</ul></body></html>""".encode()
+
+
+def test_parses_todays_points_only():
+    tides = parse_tide_data(_page("""
+<li class="point point-high"><h3>6:54 am</h3><span>1.52m</span></li>
+<li class="point point-low"><h3>1:42 pm</h3><span>0.46m</span></li>
+"""))
+    assert tides.time_strs == ["6:54 am", "1:42 pm"]
+    assert tides.height_strs == ["1.52m", "0.46m"]
+    assert tides.heights == [1.52, 0.46]
+    assert tides.types == bytearray([HIGH, LOW])
+
+
+def test_point_missing_span_does_not_swallow_next_point():
+    tides = parse_tide_data(_page("""
+<li class="point point-high"><h3>6:54 am</h3><span>1.52m</span></li>
+<li class="point-low"><h3>1:42 pm</h3></li>
+<li class="point-high"><h3>7:07 pm</h3><span>1.03m</span></li>
+<li class="point-low"><h3>11:01 pm</h3><span>0.44m</span></li>
+"""))
+    assert tides.time_strs == ["6:54 am", "7:07 pm", "11:01 pm"]
+    assert tides.types == bytearray([HIGH, HIGH, LOW])
+
+
+def test_inner_markup_is_stripped():
+    tides = parse_tide_data(_page("""
+<li class="point point-low"><h3><time>6:54&nbsp;am</time></h3><span>0.46<abbr>m</abbr></span></li>
+"""))
+    assert tides.time_strs == ["6:54\xa0am"]
+    assert tides.height_strs == ["0.46m"]
+    assert tides.times[0].hour == 6 and tides.times[0].minute == 54
+
+
+def test_single_quoted_classes():
+    tides = parse_tide_data(
+        b"<ul><li class='day'><ul>"
+        b"<li class='point point-high'><h3>1:07 pm</h3><span>1.52m</span></li>"
+        b"</ul></li></ul>"
+    )
+    assert tides.time_strs == ["1:07 pm"]
+    assert tides.types == bytearray([HIGH])
+
+
+def test_data_class_is_not_a_day_section():
+    tides = parse_tide_data(
+        b'<ul><li data-class="day"><ul>'
+        b'<li class="point-high"><h3>1:00 am</h3><span>9.9m</span></li>'
+        b'</ul></li>'
+        b'<li class="day"><ul>'
+        b'<li class="point-low"><h3>2:00 pm</h3><span>0.2m</span></li>'
+        b'</ul></li></ul>'
+    )
+    assert tides.time_strs == ["2:00 pm"]
+    assert tides.types == bytearray([LOW])
+
+
+def test_page_without_tide_data():
+    assert len(parse_tide_data(b"<html><body><p>Please accept cookies</p></body></html>")) == 0
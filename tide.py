@@ -4,157 +4,314 @@ Moonee Beach Tide CLI
 Fetches and displays tide information from WillyWeather
 """
 
+import json
+import os
+import re
 import sys
-from datetime import datetime
-from typing import List, Dict, Optional
-import requests
-from bs4 import BeautifulSoup
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.text import Text
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import lru_cache
+from html import unescape
+from pathlib import Path
+from typing import List, Dict, Mapping, Optional, Tuple
 
 # Constants
 TIDE_URL = "https://tides.willyweather.com.au/nsw/mid-north-coast/moonee-beach.html"
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+CACHE_TTL = 45 * 60  # seconds; predictions only change every few hours
 
-console = Console()
+# Tide type codes stored in Tides.types
+HIGH = ord("H")
+LOW = ord("L")
+_TYPE_NAMES = {HIGH: "HIGH", LOW: "LOW"}
 
+# The page layout is stable, so tide points are pulled straight out of the
+# raw HTML rather than building a DOM. Class names match as whole tokens,
+# like the CSS selectors li.day / li.point-high / li.point-low.
+_DAY_RE = re.compile(rb'''<li\b[^>]*?\sclass=["'](?:[^"'>]*\s)?day(?:\s[^"'>]*)?["']''')
+_TIDE_RE = re.compile(
+    rb'''<li\b[^>]*?\sclass=["'](?:[^"'>]*\s)?point-(high|low)(?:\s[^"'>]*)?["'][^>]*>'''
+    rb'(?:(?!</li>).)*?<h3\b[^>]*>((?:(?!</li>).)*?)</h3>'
+    rb'(?:(?!</li>).)*?<span\b[^>]*>((?:(?!</li>).)*?)</span>',
+    re.S,
+)
+_TAG_RE = re.compile(rb'<[^>]+>')
 
-def fetch_tide_data() -> Optional[str]:
-    """Fetch the HTML content from WillyWeather."""
+
+@dataclass
+class Tides:
+    """Today's tides as parallel arrays, sorted by time."""
+    __slots__ = ("times", "heights", "types", "time_strs", "height_strs")
+    
+    times: List[datetime]
+    heights: List[float]  # metres
+    types: bytearray  # HIGH / LOW per tide
+    time_strs: List[str]
+    height_strs: List[str]  # as shown on the page, e.g. "1.52m"
+    
+    def __len__(self) -> int:
+        return len(self.times)
+
+
+def _empty_tides() -> Tides:
+    return Tides([], [], bytearray(), [], [])
+
+
+def _cache_path() -> Path:
+    """Location of the cached WillyWeather page."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "tide" / "moonee.html"
+
+
+def _validators_path() -> Path:
+    """Sidecar file holding the cached page's ETag / Last-Modified."""
+    return _cache_path().with_suffix(".json")
+
+
+def _read_cache() -> Tuple[Optional[bytes], bool]:
+    """Return today's cached HTML (if any) and whether it's younger than CACHE_TTL.
+    
+    A copy saved on an earlier day is ignored: the page's first day section
+    would be yesterday's tides, and revalidating it with a 304 would keep
+    it around past midnight.
+    """
+    path = _cache_path()
+    try:
+        mtime = path.stat().st_mtime
+        if datetime.fromtimestamp(mtime).date() != date.today():
+            return None, False
+        is_fresh = time.time() - mtime < CACHE_TTL
+        return path.read_bytes(), is_fresh
+    except OSError:
+        return None, False
+
+
+def _conditional_headers() -> Dict[str, str]:
+    """Build If-None-Match / If-Modified-Since headers for the cached page."""
+    try:
+        validators = json.loads(_validators_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def _replace_file(path: Path, data: bytes):
+    """Write data to path atomically."""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _write_cache(html: bytes, response_headers: Mapping[str, str]):
+    """Atomically store the fetched HTML and its validators in the cache."""
+    path = _cache_path()
+    validators = {
+        "etag": response_headers.get("ETag"),
+        "last_modified": response_headers.get("Last-Modified"),
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _replace_file(path, html)
+        _replace_file(_validators_path(), json.dumps(validators).encode())
+    except OSError:
+        # Caching is best-effort; a read-only home shouldn't break the CLI
+        pass
+
+
+@lru_cache(maxsize=None)
+def _get_session():
+    """Create the shared requests session on first use.
+    
+    requests is imported here rather than at module load: it is most of
+    the script's import time and isn't needed at all on a cache hit.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    # Long-lived session so repeat requests reuse the pooled TCP+TLS connection
+    session = requests.Session()
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept": "text/html",
+        "Accept-Encoding": "gzip, deflate",
+    })
+    session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+    return session
+
+
+def fetch_tide_data() -> Tuple[Optional[bytes], Optional[Mapping[str, str]]]:
+    """Fetch the raw HTML from WillyWeather (or the local cache).
+    
+    Returns the page and, if it was freshly downloaded, the response headers.
+    A new download isn't cached here; pass it to _write_cache once it has
+    parsed, so a consent or error page returned with a 200 isn't kept.
+    """
+    cached, is_fresh = _read_cache()
+    if is_fresh:
+        return cached, None
+    
+    # Revalidate a stale copy from today so an unchanged page costs only a 304
+    headers = _conditional_headers() if cached is not None else {}
+    
+    session = _get_session()
+    from requests import RequestException
+    
     try:
-        headers = {"User-Agent": USER_AGENT}
-        response = requests.get(TIDE_URL, headers=headers, timeout=10)
+        response = session.get(TIDE_URL, headers=headers, timeout=10)
         response.raise_for_status()
-        return response.text
-    except requests.RequestException as e:
-        console.print(f"[red]Error fetching tide data: {e}[/red]")
-        return None
+    except RequestException as e:
+        print(f"Error fetching tide data: {e}", file=sys.stderr)
+        return None, None
+    
+    if response.status_code == 304 and cached is not None:
+        try:
+            _cache_path().touch()
+        except OSError:
+            pass
+        return cached, None
+    
+    # Keep the undecoded body; the parser only decodes the fields it needs
+    return response.content, response.headers
+
 
+def _text(raw: bytes) -> str:
+    """Decode a captured UTF-8 fragment from the page, dropping any tags."""
+    return unescape(_TAG_RE.sub(b"", raw).decode("utf-8", errors="replace")).strip()
+
+
+def _parse_tide_time(time_str: str, today: datetime) -> Optional[datetime]:
+    """Turn a time like "6:54 am" into a datetime on the given day."""
+    try:
+        hour_str, rest = time_str.split(":")
+        hour, minute = int(hour_str), int(rest[:2])
+        am_pm = rest[2:].strip().lower()
+        if am_pm not in ("am", "pm") or not 1 <= hour <= 12:
+            raise ValueError(time_str)
+        return today.replace(hour=hour % 12 + (12 if am_pm == "pm" else 0), minute=minute)
+    except ValueError:
+        pass
+    
+    # Fall back to strptime for anything the fast path doesn't recognise
+    for fmt in ("%I:%M %p", "%I:%M%p"):
+        try:
+            tide_time = datetime.strptime(time_str, fmt)
+        except ValueError:
+            continue
+        return today.replace(hour=tide_time.hour, minute=tide_time.minute)
+    
+    return None
 
-def parse_tide_data(html: str) -> List[Dict]:
+
+def parse_tide_data(html: bytes) -> Tides:
     """Parse tide information from HTML."""
-    soup = BeautifulSoup(html, "lxml")
-    tides = []
+    tides = _empty_tides()
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
     
     try:
-        # Find today's tide section (first li with class="day")
-        today_section = soup.find("li", class_="day")
-        
-        if not today_section:
-            console.print("[red]Could not find tide data on the page.[/red]")
-            return []
+        # Find today's tide section: from the first li.day up to the next
+        day_match = _DAY_RE.search(html)
+        if day_match is None:
+            print("Could not find tide data on the page.", file=sys.stderr)
+            return tides
         
-        # Find all tide points within today
-        tide_points = today_section.find_all("li", class_=lambda x: x and ("point-high" in x or "point-low" in x))
+        next_day_match = _DAY_RE.search(html, day_match.end())
+        day_end = next_day_match.start() if next_day_match else len(html)
         
-        for point in tide_points:
-            # Determine if high or low tide
-            point_classes = point.get("class", [])
-            tide_type = "HIGH" if "point-high" in point_classes else "LOW"
+        for point in _TIDE_RE.finditer(html, day_match.end(), day_end):
+            kind, time_raw, height_raw = point.groups()
             
-            # Extract time from h3 tag
-            time_elem = point.find("h3")
-            if not time_elem:
-                continue
+            # Determine if high or low tide
+            tide_type = HIGH if kind == b"high" else LOW
             
-            time_str = time_elem.get_text(strip=True)
+            # Time comes from the h3 tag, height from the span tag
+            time_str = _text(time_raw)
+            height_str = _text(height_raw)
             
-            # Extract height from span tag
-            height_elem = point.find("span")
-            if not height_elem:
+            try:
+                height = float(height_str.rstrip(" m"))
+            except ValueError:
                 continue
             
-            height_str = height_elem.get_text(strip=True)
-            
             # Parse time to compare with current time
-            try:
-                tide_time = datetime.strptime(time_str, "%I:%M %p")
-                # Set to today's date
-                now = datetime.now()
-                tide_time = tide_time.replace(year=now.year, month=now.month, day=now.day)
-            except ValueError:
-                # If parsing fails, try alternative format without space
-                try:
-                    tide_time = datetime.strptime(time_str, "%I:%M%p")
-                    now = datetime.now()
-                    tide_time = tide_time.replace(year=now.year, month=now.month, day=now.day)
-                except ValueError:
-                    tide_time = None
+            tide_time = _parse_tide_time(time_str, today)
+            if tide_time is None:
+                continue
             
-            tides.append({
-                "time_str": time_str,
-                "time": tide_time,
-                "height": height_str,
-                "type": tide_type
-            })
+            tides.times.append(tide_time)
+            tides.heights.append(height)
+            tides.types.append(tide_type)
+            tides.time_strs.append(time_str)
+            tides.height_strs.append(height_str)
     
     except Exception as e:
-        console.print(f"[red]Error parsing tide data: {e}[/red]")
-        return []
+        print(f"Error parsing tide data: {e}", file=sys.stderr)
+        return _empty_tides()
     
     return tides
 
 
-def find_next_high_tide(tides: List[Dict]) -> Optional[int]:
-    """Find the index of the next high tide."""
-    now = datetime.now()
+def _next_tide_index(tides: Tides, now: datetime) -> int:
+    """Index of the first tide after now (len(tides) if there is none)."""
+    return bisect_right(tides.times, now)
+
+
+def find_next_high_tide(tides: Tides, next_idx: Optional[int] = None) -> Optional[int]:
+    """Find the index of the next high tide.
     
-    for i, tide in enumerate(tides):
-        if tide["type"] == "HIGH" and tide["time"] and tide["time"] > now:
-            return i
+    next_idx is the index of the next tide of any kind, if already known.
+    """
+    i = _next_tide_index(tides, datetime.now()) if next_idx is None else next_idx
+    while i < len(tides) and tides.types[i] != HIGH:
+        i += 1
     
     # If no future high tide today, return None
-    return None
+    return i if i < len(tides) else None
 
 
-def get_current_tide_status(tides: List[Dict]) -> Optional[Dict]:
+def get_current_tide_status(
+    tides: Tides, now: Optional[datetime] = None, next_idx: Optional[int] = None
+) -> Optional[Dict]:
     """Calculate the current tide status based on surrounding tides."""
-    if len(tides) < 2:
-        return None
-    
-    now = datetime.now()
+    if now is None:
+        now = datetime.now()
     
     # Find the two tides we're between (previous and next)
-    prev_tide = None
-    next_tide = None
-    
-    for i, tide in enumerate(tides):
-        if tide["time"] is None:
-            continue
-        
-        if tide["time"] <= now:
-            prev_tide = tide
-        elif tide["time"] > now and next_tide is None:
-            next_tide = tide
-            break
+    if next_idx is None:
+        next_idx = _next_tide_index(tides, now)
+    prev_idx = next_idx - 1
     
     # If we don't have both surrounding tides, we can't calculate
-    if prev_tide is None or next_tide is None:
+    if prev_idx < 0 or next_idx >= len(tides):
         return None
     
+    prev_time = tides.times[prev_idx]
+    next_time = tides.times[next_idx]
+    
     # Calculate progress between the two tides
-    total_duration = (next_tide["time"] - prev_tide["time"]).total_seconds()
-    elapsed = (now - prev_tide["time"]).total_seconds()
+    total_duration = (next_time - prev_time).total_seconds()
+    elapsed = (now - prev_time).total_seconds()
     progress = elapsed / total_duration if total_duration > 0 else 0
     
-    # Parse heights as floats
-    try:
-        prev_height = float(prev_tide["height"].replace("m", ""))
-        next_height = float(next_tide["height"].replace("m", ""))
-    except (ValueError, AttributeError):
-        return None
-    
     # Calculate current estimated height (simple linear interpolation)
+    prev_height = tides.heights[prev_idx]
+    next_height = tides.heights[next_idx]
     current_height = prev_height + (next_height - prev_height) * progress
     
     # Determine if rising or falling
-    is_rising = next_tide["type"] == "HIGH"
+    is_rising = tides.types[next_idx] == HIGH
     direction = "Rising" if is_rising else "Falling"
     
     # Calculate time until next tide
-    time_remaining = next_tide["time"] - now
+    time_remaining = next_time - now
     hours_remaining = time_remaining.total_seconds() / 3600
     
     return {
@@ -162,41 +319,58 @@ def get_current_tide_status(tides: List[Dict]) -> Optional[Dict]:
         "direction": direction,
         "is_rising": is_rising,
         "progress": progress,
-        "prev_tide": prev_tide,
-        "next_tide": next_tide,
+        "prev_type": _TYPE_NAMES[tides.types[prev_idx]],
+        "next_type": _TYPE_NAMES[tides.types[next_idx]],
         "hours_remaining": hours_remaining
     }
 
 
-def display_current_tide(tides: List[Dict]):
+@lru_cache(maxsize=None)
+def _get_console():
+    """Create the rich console on first use; rich is only needed for output."""
+    from rich.console import Console
+    return Console()
+
+
+def _progress_bar(progress: float, track: str, marker: str, width: int = 20) -> str:
+    """Draw how far we are between the previous and next tide."""
+    filled = int(progress * width)
+    return track * filled + marker + track * (width - filled - 1)
+
+
+def _format_duration(hours: float) -> str:
+    """Format a number of hours like "4h 9m" (or "35m" under an hour)."""
+    if hours >= 1:
+        return f"{int(hours)}h {int((hours % 1) * 60)}m"
+    return f"{int(hours * 60)}m"
+
+
+def display_current_tide(
+    tides: Tides, now: Optional[datetime] = None, next_idx: Optional[int] = None
+):
     """Display the current tide status."""
-    status = get_current_tide_status(tides)
+    from rich.panel import Panel
+    from rich.text import Text
+    
+    status = get_current_tide_status(tides, now, next_idx)
     
     if status is None:
         return
     
     # Build a visual tide indicator
-    progress = status["progress"]
-    bar_width = 20
-    filled = int(progress * bar_width)
+    bar = _progress_bar(status["progress"], "░", "▓")
     
     if status["is_rising"]:
         # Rising tide: low → high
-        bar = "░" * filled + "▓" + "░" * (bar_width - filled - 1)
         direction_arrow = "↑"
         direction_color = "green"
     else:
-        # Falling tide: high → low  
-        bar = "░" * filled + "▓" + "░" * (bar_width - filled - 1)
+        # Falling tide: high → low
         direction_arrow = "↓"
         direction_color = "blue"
     
     # Format time remaining
-    hours = status["hours_remaining"]
-    if hours >= 1:
-        time_str = f"{int(hours)}h {int((hours % 1) * 60)}m"
-    else:
-        time_str = f"{int(hours * 60)}m"
+    time_str = _format_duration(status["hours_remaining"])
     
     # Create the current tide display
     current_text = Text()
@@ -206,11 +380,12 @@ def display_current_tide(tides: List[Dict]):
     
     progress_text = Text()
     progress_text.append("  ", style="")
-    progress_text.append(f"{status['prev_tide']['type'].lower()} ", style="dim")
+    progress_text.append(f"{status['prev_type'].lower()} ", style="dim")
     progress_text.append(f"[{bar}]", style="cyan")
-    progress_text.append(f" {status['next_tide']['type'].lower()}", style="dim")
-    progress_text.append(f"  ({time_str} to {status['next_tide']['type'].lower()})", style="dim")
+    progress_text.append(f" {status['next_type'].lower()}", style="dim")
+    progress_text.append(f"  ({time_str} to {status['next_type'].lower()})", style="dim")
     
+    console = _get_console()
     console.print()
     console.print(Panel(
         Text.assemble(current_text, "\n", progress_text),
@@ -220,8 +395,60 @@ def display_current_tide(tides: List[Dict]):
     ))
 
 
-def display_tides(tides: List[Dict]):
+def _display_tides_plain(tides: Tides):
+    """Display tide information as plain ASCII, for when stdout isn't a terminal."""
+    if not tides:
+        print("No tide data available.")
+        return
+    
+    now = datetime.now()
+    next_idx = _next_tide_index(tides, now)
+    next_high_idx = find_next_high_tide(tides, next_idx)
+    
+    status = get_current_tide_status(tides, now, next_idx)
+    if status is not None:
+        bar = _progress_bar(status["progress"], "-", "#")
+        prev_type = status["prev_type"].lower()
+        next_type = status["next_type"].lower()
+        print()
+        print(f"Current: {status['current_height']:.2f}m {status['direction']}")
+        print(
+            f"{prev_type} [{bar}] {next_type}  "
+            f"({_format_duration(status['hours_remaining'])} to {next_type})"
+        )
+    
+    print()
+    print(f"Moonee Beach Tides - {now.strftime('%A, %b %d %Y')}")
+    for i in range(len(tides)):
+        indicator = "->" if i == next_high_idx else ""
+        type_text = "HIGH" if tides.types[i] == HIGH else "low"
+        marker = "<- NEXT HIGH" if i == next_high_idx else ""
+        print(
+            f"{indicator:<3} {tides.time_strs[i]:<10} {type_text:<6} "
+            f"{tides.height_strs[i]:<8} {marker}".rstrip()
+        )
+    print()
+    
+    if next_high_idx is not None:
+        print(f"Next High Tide: {tides.time_strs[next_high_idx]} ({tides.height_strs[next_high_idx]})")
+    else:
+        print("No more high tides today. Check tomorrow!")
+    print()
+
+
+def display_tides(tides: Tides):
     """Display tide information with the next high tide highlighted."""
+    # Piped or redirected output gets plain text; rich's terminal probing
+    # and box drawing only pay off on a real terminal
+    if not sys.stdout.isatty():
+        _display_tides_plain(tides)
+        return
+    
+    from rich.panel import Panel
+    from rich.text import Text
+    
+    console = _get_console()
+    
     if not tides:
         console.print("[yellow]No tide data available.[/yellow]")
         return
@@ -230,28 +457,26 @@ def display_tides(tides: List[Dict]):
     now = datetime.now()
     date_str = now.strftime("%A, %b %d %Y")
     
+    # Locate now among today's tides once and share it with the helpers
+    next_idx = _next_tide_index(tides, now)
+    
     # Display current tide status first
-    display_current_tide(tides)
+    display_current_tide(tides, now, next_idx)
     
     # Find next high tide
-    next_high_idx = find_next_high_tide(tides)
+    next_high_idx = find_next_high_tide(tides, next_idx)
     
     # Create title
     title = Text(f"Moonee Beach Tides - {date_str}", style="bold cyan")
     
-    # Create table
-    table = Table(show_header=False, box=None, padding=(0, 1))
-    table.add_column("Indicator", style="yellow", width=3)
-    table.add_column("Time", style="white", width=10)
-    table.add_column("Type", width=6)
-    table.add_column("Height", style="cyan", width=8)
-    table.add_column("Marker", style="bold green", width=15)
-    
-    for i, tide in enumerate(tides):
+    # Pre-format the rows into one Text; a Table would re-measure every
+    # cell to lay out what are effectively fixed-width columns
+    rows = Text()
+    for i in range(len(tides)):
         indicator = "→" if i == next_high_idx else " "
         
         # Style based on tide type
-        if tide["type"] == "HIGH":
+        if tides.types[i] == HIGH:
             type_style = "bold white"
             type_text = "HIGH"
         else:
@@ -260,26 +485,25 @@ def display_tides(tides: List[Dict]):
         
         marker = "← NEXT HIGH" if i == next_high_idx else ""
         
-        table.add_row(
-            indicator,
-            tide["time_str"],
-            Text(type_text, style=type_style),
-            tide["height"],
-            marker
-        )
+        if i:
+            rows.append("\n")
+        rows.append(f" {indicator:<3}  ", style="yellow")
+        rows.append(f"{tides.time_strs[i]:<10}  ", style="white")
+        rows.append(f"{type_text:<6}  ", style=type_style)
+        rows.append(f"{tides.height_strs[i]:<8}  ", style="cyan")
+        rows.append(marker, style="bold green")
     
     # Display in a panel
     console.print()
-    console.print(Panel(table, title=title, border_style="blue"))
+    console.print(Panel(rows, title=title, border_style="blue"))
     console.print()
     
     # Show next high tide summary
     if next_high_idx is not None:
-        next_high = tides[next_high_idx]
         summary = Text()
         summary.append("Next High Tide: ", style="bold")
-        summary.append(f"{next_high['time_str']}", style="bold green")
-        summary.append(f" ({next_high['height']})", style="cyan")
+        summary.append(f"{tides.time_strs[next_high_idx]}", style="bold green")
+        summary.append(f" ({tides.height_strs[next_high_idx]})", style="cyan")
         console.print(summary)
         console.print()
     else:
@@ -289,19 +513,27 @@ def display_tides(tides: List[Dict]):
 
 def main():
     """Main entry point."""
-    console.print("[dim]Fetching tide data for Moonee Beach...[/dim]")
-    
-    # Fetch data
-    html = fetch_tide_data()
+    # Fetch data in the background and load rich while it's in flight
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(fetch_tide_data)
+        if sys.stdout.isatty():
+            _get_console().print("[dim]Fetching tide data for Moonee Beach...[/dim]")
+        else:
+            print("Fetching tide data for Moonee Beach...")
+        html, response_headers = pending.result()
     if not html:
         sys.exit(1)
     
     # Parse data
     tides = parse_tide_data(html)
     if not tides:
-        console.print("[red]Failed to parse tide data. The website structure may have changed.[/red]")
+        print("Failed to parse tide data. The website structure may have changed.", file=sys.stderr)
         sys.exit(1)
     
+    # Only cache a new download once we know it holds tide data
+    if response_headers is not None:
+        _write_cache(html, response_headers)
+    
     # Display
     display_tides(tides)
 